@@ -1,18 +1,20 @@
 """LangChain agent for shoe product discovery."""
 
-import json
+import asyncio
+import hashlib
 import os
 from typing import AsyncIterator
 
-from dotenv import load_dotenv
-
-load_dotenv()
-
+import orjson
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_openai import ChatOpenAI
 
-from tools import AsyncShoeSearchTool, ShoeSearchTool, get_shoe_tools
+from tools import (
+    AsyncShoeSearchTool,
+    ShoeSearchTool,
+    _SemanticShoeCache,
+    get_shoe_tools,
+)
 
 
 def get_openai_api_key() -> str:
@@ -46,6 +48,92 @@ When presenting results:
 
 If a shoe isn't found, suggest similar alternatives or ask for clarification."""
 
+# Final answers are reused only for very close rewordings of the same question
+RESPONSE_CACHE_THRESHOLD = 0.92
+RESPONSE_CACHE_CHUNK_SIZE = 1024
+
+# The prompt never changes, so build it once per process rather than per session
+_SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_PROMPT)
+_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+    _SYSTEM_MESSAGE,
+    MessagesPlaceholder(variable_name="chat_history"),
+    ("human", "{input}"),
+    MessagesPlaceholder(variable_name="agent_scratchpad"),
+])
+
+
+class _ResponseCache(_SemanticShoeCache):
+    """Semantic cache of final agent answers keyed by user input.
+
+    Entries are scoped to a hash of the recent chat history so a cached
+    answer is only reused in the same conversational context.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(threshold=RESPONSE_CACHE_THRESHOLD)
+
+    @staticmethod
+    def history_key(chat_history: list) -> str:
+        """Hash the last few turns of chat history into a cache scope."""
+        return hashlib.blake2b(
+            str(chat_history[-4:]).encode(), digest_size=8
+        ).hexdigest()
+
+
+_response_cache = _ResponseCache()
+
+
+def _found_all_shoes(tool_result: str) -> bool:
+    """Whether every shoe in a tool result came back with sources.
+
+    Failed or timed-out searches come back as entries with no sources; an
+    answer built on them shouldn't be cached and replayed.
+    """
+    data = orjson.loads(tool_result)
+    shoes = data.get("shoes", [data])
+    return bool(shoes) and all(shoe.get("sources") for shoe in shoes)
+
+
+def _merge_tool_calls(tool_call_chunks: list) -> list[dict]:
+    """Merge streamed tool call fragments into complete tool calls.
+
+    Calls with no name or with args that don't parse to a JSON object are
+    dropped rather than executed with empty input.
+    """
+    merged: dict = {}
+    for chunk in tool_call_chunks:
+        # Only the first fragment of a call carries its id; index ties them together
+        key = chunk.get("index")
+        if key is None:
+            key = chunk.get("id")
+        call = merged.get(key)
+        if call is None:
+            call = merged[key] = {"name": "", "args": [], "id": None}
+        if chunk.get("name"):
+            call["name"] += chunk["name"]
+        if chunk.get("args"):
+            call["args"].append(chunk["args"])
+        if chunk.get("id"):
+            call["id"] = chunk["id"]
+
+    tool_calls = []
+    for call in merged.values():
+        raw_args = "".join(call["args"])
+        try:
+            args = orjson.loads(raw_args) if raw_args else {}
+        except orjson.JSONDecodeError:
+            args = None
+        # Like AIMessageChunk's invalid_tool_calls, malformed calls aren't run
+        if not call["name"] or not isinstance(args, dict):
+            continue
+        tool_calls.append({
+            "name": call["name"],
+            "args": args,
+            "id": call["id"],
+            "type": "tool_call",
+        })
+    return tool_calls
+
 
 class ShoeDiscoveryAgent:
     """Agent for shoe product discovery using LangChain and Tavily."""
@@ -54,43 +142,34 @@ class ShoeDiscoveryAgent:
         self,
         model_name: str = "gpt-4o-mini",
         temperature: float = 0.1,
+        batch_mode: bool | None = None,
     ) -> None:
+        # Imported here so quick_search() doesn't pay for the OpenAI client stack
+        from langchain_openai import ChatOpenAI
+
         self.llm = ChatOpenAI(
             model=model_name,
             temperature=temperature,
             api_key=get_openai_api_key(),
         )
-        self.tools = get_shoe_tools()
+        self.tools = get_shoe_tools(batch_mode=batch_mode)
         self.llm_with_tools = self.llm.bind_tools(self.tools)
+        self._tool_by_name = {tool.name: tool for tool in self.tools}
+        self._extract_by_name = {
+            tool.name: tool._extract_input for tool in self.tools
+        }
 
-        self.prompt = ChatPromptTemplate.from_messages([
-            SystemMessage(content=SYSTEM_PROMPT),
-            MessagesPlaceholder(variable_name="chat_history"),
-            ("human", "{input}"),
-            MessagesPlaceholder(variable_name="agent_scratchpad"),
-        ])
+        self.prompt = _PROMPT_TEMPLATE
 
     async def _execute_tool(self, tool_name: str, tool_input: dict) -> str:
         """Execute a tool by name."""
-        for tool in self.tools:
-            if tool.name == tool_name:
-                if hasattr(tool, "_arun"):
-                    if isinstance(tool_input, dict):
-                        input_val = tool_input.get(
-                            "shoe_names", tool_input.get("shoe_name", "")
-                        )
-                    else:
-                        input_val = str(tool_input)
-                    return await tool._arun(input_val)
-                else:
-                    if isinstance(tool_input, dict):
-                        input_val = tool_input.get(
-                            "shoe_name", tool_input.get("shoe_names", "")
-                        )
-                    else:
-                        input_val = str(tool_input)
-                    return tool._run(input_val)
-        raise ValueError(f"Tool {tool_name} not found")
+        tool = self._tool_by_name.get(tool_name)
+        if tool is None:
+            raise ValueError(f"Tool {tool_name} not found")
+
+        input_val = self._extract_by_name[tool_name](tool_input)
+        # Sync-only tools inherit BaseTool._arun, which runs _run in an executor
+        return await tool._arun(input_val)
 
     async def run(
         self,
@@ -101,14 +180,31 @@ class ShoeDiscoveryAgent:
         if chat_history is None:
             chat_history = []
 
-        messages = [SystemMessage(content=SYSTEM_PROMPT)]
+        # Embedding runs ONNX inference, so keep it off the event loop
+        history_key = _ResponseCache.history_key(chat_history)
+        cached, embedding = await asyncio.to_thread(
+            _response_cache.get, user_input, history_key
+        )
+        if cached is not None:
+            return cached
+
+        messages = [_SYSTEM_MESSAGE]
         messages.extend(chat_history)
         messages.append(HumanMessage(content=user_input))
+        cacheable = True
 
         while True:
             response = await self.llm_with_tools.ainvoke(messages)
 
             if not response.tool_calls:
+                if cacheable:
+                    await asyncio.to_thread(
+                        _response_cache.put,
+                        user_input,
+                        response.content,
+                        history_key,
+                        embedding,
+                    )
                 return response.content
 
             messages.append(response)
@@ -118,6 +214,7 @@ class ShoeDiscoveryAgent:
                     tool_call["name"],
                     tool_call["args"],
                 )
+                cacheable = cacheable and _found_all_shoes(tool_result)
 
                 messages.append({
                     "role": "tool",
@@ -134,35 +231,58 @@ class ShoeDiscoveryAgent:
         if chat_history is None:
             chat_history = []
 
-        messages = [SystemMessage(content=SYSTEM_PROMPT)]
+        # Embedding runs ONNX inference, so keep it off the event loop
+        history_key = _ResponseCache.history_key(chat_history)
+        cached, embedding = await asyncio.to_thread(
+            _response_cache.get, user_input, history_key
+        )
+        if cached is not None:
+            for i in range(0, len(cached), RESPONSE_CACHE_CHUNK_SIZE):
+                yield cached[i:i + RESPONSE_CACHE_CHUNK_SIZE]
+            return
+
+        messages = [_SYSTEM_MESSAGE]
         messages.extend(chat_history)
         messages.append(HumanMessage(content=user_input))
+        cacheable = True
 
         while True:
-            full_response = None
+            content_parts: list[str] = []
+            tool_call_chunks: list = []
 
             async for chunk in self.llm_with_tools.astream(messages):
                 if chunk.content:
+                    content_parts.append(chunk.content)
                     yield chunk.content
 
-                if full_response is None:
-                    full_response = chunk
-                else:
-                    full_response = full_response + chunk
-
-            # Tool calls are only complete on the accumulated message, not individual chunks
-            if not full_response or not full_response.tool_calls:
+                tool_call_chunks.extend(chunk.tool_call_chunks)
+
+            # Tool call args arrive as fragments and only parse once merged
+            tool_calls = _merge_tool_calls(tool_call_chunks)
+            if not tool_calls:
+                # Cache only the final answer, matching what run() returns
+                if cacheable:
+                    await asyncio.to_thread(
+                        _response_cache.put,
+                        user_input,
+                        "".join(content_parts),
+                        history_key,
+                        embedding,
+                    )
                 break
 
-            messages.append(full_response)
+            messages.append(
+                AIMessage(content="".join(content_parts), tool_calls=tool_calls)
+            )
 
-            for tool_call in full_response.tool_calls:
+            for tool_call in tool_calls:
                 yield f"\n\n🔍 Searching for shoe specs...\n\n"
 
                 tool_result = await self._execute_tool(
                     tool_call["name"],
                     tool_call["args"],
                 )
+                cacheable = cacheable and _found_all_shoes(tool_result)
 
                 messages.append({
                     "role": "tool",
@@ -175,4 +295,4 @@ async def quick_search(shoe_names: list[str]) -> dict:
     """Quick search without full agent - useful for simple lookups."""
     tool = AsyncShoeSearchTool()
     result = await tool._arun(", ".join(shoe_names))
-    return json.loads(result)
+    return orjson.loads(result)
@@ -3,11 +3,13 @@
 import asyncio
 import sys
 
-from agent import ShoeDiscoveryAgent, quick_search
+from dotenv import load_dotenv
 
 
 async def interactive_mode():
     """Run interactive chat session."""
+    from agent import ShoeDiscoveryAgent
+
     print("🏃 Running Shoe Discovery CLI")
     print("Type 'quit' to exit\n")
 
@@ -38,6 +40,8 @@ async def interactive_mode():
 
 async def search_mode(shoe_names: list[str]):
     """Quick search for specific shoes."""
+    from agent import quick_search
+
     print(f"Searching for: {', '.join(shoe_names)}\n")
 
     result = await quick_search(shoe_names)
@@ -58,6 +62,8 @@ async def search_mode(shoe_names: list[str]):
 
 def main():
     """Main CLI entry point."""
+    load_dotenv()
+
     if len(sys.argv) > 1:
         shoe_names = sys.argv[1:]
         asyncio.run(search_mode(shoe_names))
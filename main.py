@@ -1,17 +1,24 @@
 """Shoe Product Discovery - RAG Chatbot for Running Shoe Specs."""
 
+import os
+from collections import deque
+
 import chainlit as cl
+from dotenv import load_dotenv
 from langchain_core.messages import AIMessage, HumanMessage
 
 from agent import ShoeDiscoveryAgent
 
+if os.path.exists(".env"):
+    load_dotenv()
+
 
 @cl.on_chat_start
 async def start():
     """Initialize agent and send welcome message."""
     agent = ShoeDiscoveryAgent()
     cl.user_session.set("agent", agent)
-    cl.user_session.set("chat_history", [])
+    cl.user_session.set("chat_history", deque(maxlen=20))
 
     await cl.Message(
         content="""# 👟 Running Shoe Specs Finder
@@ -36,7 +43,7 @@ I use real-time web search to find the most accurate specifications."""
 async def handle_message(message: cl.Message):
     """Handle incoming user messages with the LangChain agent."""
     agent: ShoeDiscoveryAgent = cl.user_session.get("agent")
-    chat_history: list = cl.user_session.get("chat_history")
+    chat_history: deque = cl.user_session.get("chat_history")
 
     user_input = message.content.strip()
 
@@ -49,7 +56,7 @@ async def handle_message(message: cl.Message):
 
     try:
         full_response = ""
-        async for chunk in agent.stream(user_input, chat_history):
+        async for chunk in agent.stream(user_input, list(chat_history)):
             full_response += chunk
             await msg.stream_token(chunk)
 
@@ -58,11 +65,6 @@ async def handle_message(message: cl.Message):
         chat_history.append(HumanMessage(content=user_input))
         chat_history.append(AIMessage(content=full_response))
 
-        if len(chat_history) > 20:
-            chat_history = chat_history[-20:]
-
-        cl.user_session.set("chat_history", chat_history)
-
     except Exception as e:
         msg.content = f"Error: {e}\n\nPlease try again or rephrase your question."
         await msg.update()
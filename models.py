@@ -1,5 +1,7 @@
 """Pydantic models for shoe product discovery."""
 
+from typing import TypedDict
+
 from pydantic import BaseModel, Field
 
 
@@ -39,3 +41,36 @@ class ShoeComparisonRequest(BaseModel):
     focus_attributes: list[str] = Field(
         default_factory=lambda: ["heel_to_toe_drop", "stack_height", "cushioning"]
     )
+
+
+# Plain-dict mirrors of the models above, used on the tool hot path where the
+# data comes from our own parsing and doesn't need validation.
+
+
+class ShoeSourceDict(TypedDict):
+    """Dict form of ShoeSource."""
+
+    title: str
+    url: str
+    content: str
+    score: float
+
+
+class ShoeSpecsDict(TypedDict):
+    """Dict form of ShoeSpecs."""
+
+    name: str
+    heel_to_toe_drop: str | None
+    stack_height: str | None
+    cushioning: str | None
+    weight: str | None
+    summary: str
+    sources: list[ShoeSourceDict]
+
+
+class ShoeSearchResultDict(TypedDict):
+    """Dict form of ShoeSearchResult."""
+
+    query: str
+    shoes: list[ShoeSpecsDict]
+    raw_answer: str | None
@@ -0,0 +1,34 @@
+"""Shared test fixtures."""
+
+import zlib
+
+import numpy as np
+import pytest
+
+import tools
+
+
+class _WordEmbedder:
+    """Bag-of-words stand-in for MiniLM that, like it, barely sees digits."""
+
+    def __init__(self) -> None:
+        self.passes = 0
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        self.passes += 1
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.split():
+                if not word.isdigit():
+                    vectors[row, zlib.crc32(word.encode()) % 64] += 1
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    embedder = _WordEmbedder()
+    monkeypatch.setattr(tools, "_get_embedder", lambda: embedder)
+    return embedder
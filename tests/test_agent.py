@@ -0,0 +1,183 @@
+"""Tests for the shoe discovery agent."""
+
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+
+import agent
+import tools
+from agent import _found_all_shoes, _merge_tool_calls
+
+
+def test_merge_tool_calls_joins_fragments_by_index():
+    chunks = [
+        {"name": "multi_shoe_search", "args": "", "id": "call_1", "index": 0},
+        {"name": None, "args": '{"shoe_names": "Nike Peg', "id": None, "index": 0},
+        {"name": None, "args": 'asus 41"}', "id": None, "index": 0},
+        {"name": "shoe_specs_search", "args": '{"shoe_name": "Ghost"}',
+         "id": "call_2", "index": 1},
+    ]
+
+    assert _merge_tool_calls(chunks) == [
+        {
+            "name": "multi_shoe_search",
+            "args": {"shoe_names": "Nike Pegasus 41"},
+            "id": "call_1",
+            "type": "tool_call",
+        },
+        {
+            "name": "shoe_specs_search",
+            "args": {"shoe_name": "Ghost"},
+            "id": "call_2",
+            "type": "tool_call",
+        },
+    ]
+
+
+def test_merge_tool_calls_drops_calls_with_unparseable_args():
+    chunks = [
+        {"name": "shoe_specs_search", "args": '{"shoe_name": "Gho', "id": "c1",
+         "index": 0},
+        {"name": "shoe_specs_search", "args": '["Ghost"]', "id": "c2", "index": 1},
+    ]
+
+    assert _merge_tool_calls(chunks) == []
+
+
+
+_FOUND = tools._specs_dict(
+    "Nike Pegasus 41",
+    "Responsive daily trainer.",
+    [{"title": "Review", "url": "https://example.com", "content": "", "score": 0.9}],
+)
+_FAILED = tools._specs_dict("Brooks Ghost 16", "Search failed: timeout")
+
+
+def test_found_all_shoes_rejects_failed_searches():
+    found = tools._fast_json(_FOUND)
+    failed = tools._fast_json(_FAILED)
+
+    assert _found_all_shoes(found)
+    assert _found_all_shoes(tools._fast_json({"shoes": [_FOUND]}))
+    assert not _found_all_shoes(failed)
+    assert not _found_all_shoes(tools._fast_json({"shoes": [_FOUND, _FAILED]}))
+    assert not _found_all_shoes(tools._fast_json({"shoes": []}))
+
+
+class _FakeLLM:
+    """Replays scripted turns of (content pieces, shoe to search or None)."""
+
+    def __init__(self, turns: list[tuple[list[str], str | None]]) -> None:
+        self.turns = iter(turns)
+        self.calls = 0
+
+    def _next_turn(self) -> tuple[list[str], list[dict]]:
+        self.calls += 1
+        pieces, shoe_name = next(self.turns)
+        tool_calls = [] if shoe_name is None else [{
+            "name": "shoe_specs_search",
+            "args": {"shoe_name": shoe_name},
+            "id": f"call_{self.calls}",
+        }]
+        return pieces, tool_calls
+
+    async def ainvoke(self, messages: list) -> AIMessage:
+        pieces, tool_calls = self._next_turn()
+        return AIMessage(content="".join(pieces), tool_calls=tool_calls)
+
+    async def astream(self, messages: list):
+        pieces, tool_calls = self._next_turn()
+        for piece in pieces:
+            yield AIMessageChunk(content=piece)
+        for i, call in enumerate(tool_calls):
+            yield AIMessageChunk(content="", tool_call_chunks=[{
+                "name": call["name"],
+                "args": tools._fast_json(call["args"]),
+                "id": call["id"],
+                "index": i,
+            }])
+
+
+class _FakeSearchTool:
+    name = "shoe_specs_search"
+
+    def __init__(self, specs: dict) -> None:
+        self.specs = specs
+
+    def _extract_input(self, args: dict) -> str:
+        return args["shoe_name"]
+
+    async def _arun(self, shoe_name: str) -> str:
+        return tools._fast_json(self.specs)
+
+
+def _make_agent(turns: list, specs: dict = _FOUND) -> agent.ShoeDiscoveryAgent:
+    """Build an agent around a scripted LLM without an OpenAI client."""
+    shoe_agent = agent.ShoeDiscoveryAgent.__new__(agent.ShoeDiscoveryAgent)
+    tool = _FakeSearchTool(specs)
+    shoe_agent.llm_with_tools = _FakeLLM(turns)
+    shoe_agent._tool_by_name = {tool.name: tool}
+    shoe_agent._extract_by_name = {tool.name: tool._extract_input}
+    return shoe_agent
+
+
+def _stream(shoe_agent, user_input: str, chat_history=None) -> list[str]:
+    async def collect() -> list[str]:
+        return [c async for c in shoe_agent.stream(user_input, chat_history)]
+
+    return asyncio.run(collect())
+
+
+@pytest.fixture(autouse=True)
+def response_cache(embedder, monkeypatch):
+    cache = agent._ResponseCache()
+    monkeypatch.setattr(agent, "_response_cache", cache)
+    return cache
+
+
+_SEARCH_THEN_ANSWER = [
+    (["Let me look that up."], "Nike Pegasus 41"),
+    (["The Pegasus ", "is great."], None),
+]
+
+
+def test_run_serves_answer_cached_by_stream():
+    _stream(_make_agent(_SEARCH_THEN_ANSWER), "Tell me about the Nike Pegasus 41")
+
+    shoe_agent = _make_agent([])
+    answer = asyncio.run(shoe_agent.run("tell me about the nike pegasus 41"))
+
+    assert answer == "The Pegasus is great."
+    assert shoe_agent.llm_with_tools.calls == 0
+
+
+def test_stream_replays_answer_cached_by_run_in_chunks():
+    long_answer = "x" * (2 * agent.RESPONSE_CACHE_CHUNK_SIZE + 100)
+    asyncio.run(_make_agent([([long_answer], None)]).run("Compare daily trainers"))
+
+    shoe_agent = _make_agent([])
+    chunks = _stream(shoe_agent, "compare daily trainers")
+
+    assert [len(c) for c in chunks] == [1024, 1024, 100]
+    assert "".join(chunks) == long_answer
+    assert shoe_agent.llm_with_tools.calls == 0
+
+
+def test_cached_answer_is_scoped_to_chat_history():
+    asyncio.run(_make_agent(_SEARCH_THEN_ANSWER).run("Is the Pegasus 41 good?"))
+
+    shoe_agent = _make_agent([(["Depends on your pace."], None)])
+    history = [HumanMessage(content="I run marathons")]
+    answer = asyncio.run(shoe_agent.run("Is the Pegasus 41 good?", history))
+
+    assert answer == "Depends on your pace."
+    assert shoe_agent.llm_with_tools.calls == 1
+
+
+def test_answer_built_on_failed_search_is_not_cached(response_cache):
+    asyncio.run(
+        _make_agent(_SEARCH_THEN_ANSWER, specs=_FAILED).run("Is the Ghost 16 good?")
+    )
+
+    assert response_cache.get("Is the Ghost 16 good?")[0] is None
@@ -0,0 +1,134 @@
+"""Tests for the shoe search tools."""
+
+import orjson
+import pytest
+
+import tools
+
+
+@pytest.fixture
+def shoe_cache(embedder):
+    return tools._SemanticShoeCache()
+
+
+def test_cache_hits_on_paraphrased_name(shoe_cache):
+    shoe_cache.put("Nike Pegasus 41", "pegasus-41-specs")
+
+    assert shoe_cache.get("pegasus 41, nike!")[0] == "pegasus-41-specs"
+
+
+def test_cache_misses_on_different_model_version(shoe_cache):
+    shoe_cache.put("Nike Pegasus 41", "pegasus-41-specs")
+
+    assert shoe_cache.get("Nike Pegasus 40")[0] is None
+    assert shoe_cache.get("Nike Pegasus")[0] is None
+
+
+def test_cache_skips_expired_entry_for_next_best_match(shoe_cache):
+    shoe_cache.put("Nike Air Zoom Pegasus 41", "stale-specs")
+    shoe_cache._created[0] -= shoe_cache.ttl_seconds + 1
+    shoe_cache.put("Nike Air Zoom Pegasus 41 shoe", "fresh-specs")
+
+    assert shoe_cache.get("Nike Air Zoom Pegasus 41")[0] == "fresh-specs"
+    assert shoe_cache._keys == ["nike air zoom pegasus 41 shoe"]
+
+
+def _result(title: str, score: float, content: str = "") -> dict:
+    return {
+        "title": title,
+        "url": "https://example.com",
+        "content": content,
+        "score": score,
+    }
+
+
+def test_split_results_buckets_by_shoe_name():
+    pegasus = _result("Nike Pegasus 41 review", 0.9)
+    ghost = _result("Lab test", 0.8, content="The brooks ghost 16 weighs 9.5 oz")
+    both = _result("Nike Pegasus 41 vs Brooks Ghost 16", 0.7)
+
+    buckets = tools._split_results_by_shoe(
+        [pegasus, ghost, both], ["Nike Pegasus 41", "Brooks Ghost 16"]
+    )
+
+    assert buckets == {
+        "Nike Pegasus 41": [pegasus, both],
+        "Brooks Ghost 16": [ghost, both],
+    }
+
+
+def test_split_results_round_robins_unmatched_to_empty_buckets():
+    pegasus = _result("Nike Pegasus 41 review", 0.9)
+    low = _result("Best daily trainers", 0.6)
+    high = _result("Top cushioned shoes", 0.8)
+    mid = _result("Marathon picks", 0.7)
+
+    buckets = tools._split_results_by_shoe(
+        [pegasus, low, high, mid],
+        ["Nike Pegasus 41", "Brooks Ghost 16", "Hoka Clifton 9"],
+    )
+
+    # Best-scoring unmatched results go first, only to shoes with no match
+    assert buckets == {
+        "Nike Pegasus 41": [pegasus],
+        "Brooks Ghost 16": [high, low],
+        "Hoka Clifton 9": [mid],
+    }
+
+
+class _FakeAsyncTavily:
+    def __init__(self, response: dict) -> None:
+        self.response = response
+        self.calls: list[dict] = []
+
+    async def search(self, **params) -> dict:
+        self.calls.append(params)
+        return self.response
+
+
+def test_batch_search_keeps_combined_answer_out_of_shoe_summaries(
+    shoe_cache, monkeypatch
+):
+    monkeypatch.setattr(tools, "_shoe_cache", shoe_cache)
+    client = _FakeAsyncTavily({
+        "answer": "The Pegasus is firmer than the Ghost.",
+        "results": [
+            _result("Nike Pegasus 41 review", 0.9),
+            _result("Brooks Ghost 16 review", 0.9),
+        ],
+    })
+    tool = tools.AsyncShoeSearchTool(async_client=client, batch_mode=True)
+
+    result = orjson.loads(tool._run("Nike Pegasus 41, Brooks Ghost 16"))
+
+    assert len(client.calls) == 1
+    assert result["raw_answer"] == "The Pegasus is firmer than the Ghost."
+    assert all(shoe["summary"] == tools.BATCH_SUMMARY for shoe in result["shoes"])
+    assert shoe_cache.get("Brooks Ghost 16")[0] is None
+
+
+def test_get_shoe_tools_reads_batch_mode_from_env(monkeypatch):
+    monkeypatch.setattr(tools, "_get_sync_client", lambda: object())
+    monkeypatch.setattr(tools, "_get_async_client", lambda: object())
+
+    monkeypatch.setenv("SHOE_SEARCH_BATCH_MODE", "1")
+    assert tools.get_shoe_tools()[1].batch_mode
+    assert not tools.get_shoe_tools(batch_mode=False)[1].batch_mode
+
+    monkeypatch.delenv("SHOE_SEARCH_BATCH_MODE")
+    assert not tools.get_shoe_tools()[1].batch_mode
+
+
+def test_multi_search_embeds_all_names_in_one_pass(shoe_cache, embedder, monkeypatch):
+    monkeypatch.setattr(tools, "_shoe_cache", shoe_cache)
+    client = _FakeAsyncTavily({
+        "answer": "Specs.",
+        "results": [_result("Review", 0.9)],
+    })
+    tool = tools.AsyncShoeSearchTool(async_client=client)
+
+    tool._run("Nike Pegasus 41, Brooks Ghost 16")
+
+    assert len(client.calls) == 2
+    assert embedder.passes == 1
+    assert shoe_cache.get("Brooks Ghost 16")[0] is not None
@@ -2,13 +2,21 @@
 
 import asyncio
 import os
-from typing import Any
-
+import re
+import threading
+import time
+import warnings
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import orjson
 from langchain_core.tools import BaseTool, ToolException
-from pydantic import BaseModel, Field
-from tavily import AsyncTavilyClient, TavilyClient
+from pydantic import BaseModel, Field, PrivateAttr
+
+from models import ShoeSearchResultDict, ShoeSourceDict, ShoeSpecsDict
 
-from models import ShoeSearchResult, ShoeSource, ShoeSpecs
+if TYPE_CHECKING:
+    from tavily import AsyncTavilyClient, TavilyClient
 
 
 def get_tavily_api_key() -> str:
@@ -23,15 +31,465 @@ def get_tavily_api_key() -> str:
 
 
 # Trusted domains for shoe specifications
-SHOE_DOMAINS = [
+SHOE_DOMAINS = (
     "runrepeat.com",
     "solereview.com",
     "believeintherun.com",
     "roadrunnersports.com",
     "runnersworld.com",
     "doctorsofrunning.com",
-    
-]
+)
+
+# Semantic cache settings for shoe spec lookups. The embedding model is
+# all-MiniLM-L6-v2 exported to ONNX with int8 weights (see README).
+EMBEDDING_MODEL_DIR = "onnx"
+EMBEDDING_MAX_TOKENS = 256
+CACHE_SIMILARITY_THRESHOLD = 0.87
+CACHE_MAX_ENTRIES = 512
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Tavily caps max_results per search request
+TAVILY_MAX_RESULTS = 20
+
+# Per-shoe summary for batched searches, whose one answer covers every shoe
+BATCH_SUMMARY = "See raw_answer for the combined summary of all shoes."
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_NUMBER_RE = re.compile(r"\d+")
+
+
+def _make_search_params(search_depth: str, use_domain_filter: bool) -> dict:
+    """Build the Tavily search params shared by every query from a tool."""
+    params = {
+        "search_depth": search_depth,
+        "max_results": 5,
+        "include_answer": "advanced",
+    }
+    if use_domain_filter:
+        params["include_domains"] = SHOE_DOMAINS
+    return params
+
+
+def _fast_json(data: Any) -> str:
+    """Serialize plain tool data to compact JSON."""
+    return orjson.dumps(data).decode()
+
+
+def _specs_dict(
+    shoe_name: str, summary: str, sources: list[ShoeSourceDict] | None = None
+) -> ShoeSpecsDict:
+    """Build a ShoeSpecs-shaped dict without model validation."""
+    return {
+        "name": shoe_name,
+        "heel_to_toe_drop": None,
+        "stack_height": None,
+        "cushioning": None,
+        "weight": None,
+        "summary": summary,
+        "sources": sources or [],
+    }
+
+
+_sync_client: "TavilyClient | None" = None
+_async_client: "AsyncTavilyClient | None" = None
+_client_lock = threading.Lock()
+
+
+class _BorrowedClient:
+    """Async context manager that lends out a client without closing it."""
+
+    def __init__(self, client) -> None:
+        self._client = client
+
+    async def __aenter__(self):
+        return self._client
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+
+class _PooledAsyncClient:
+    """Stand-in for Tavily's per-request httpx client factory.
+
+    AsyncTavilyClient opens (and closes) a fresh httpx.AsyncClient for every
+    request. This keeps one long-lived client for the first event loop that
+    searches (the Chainlit or CLI loop) so keep-alive connections and TLS
+    sessions are reused. httpx connections can't cross loops, so any other
+    loop gets the SDK's usual client-per-request, which closes itself and
+    never outlives its loop.
+    """
+
+    def __init__(self, create_client) -> None:
+        self._create_client = create_client
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client = None
+
+    def __call__(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+            self._client = self._create_client()
+        if loop is self._loop:
+            return _BorrowedClient(self._client)
+        return self._create_client()
+
+
+def _get_sync_client() -> "TavilyClient":
+    """Get the process-wide Tavily client."""
+    global _sync_client
+    with _client_lock:
+        if _sync_client is None:
+            # Deferred so importing tools stays cheap until a search is made
+            from tavily import TavilyClient
+
+            _sync_client = TavilyClient(api_key=get_tavily_api_key())
+    return _sync_client
+
+
+def _get_async_client() -> "AsyncTavilyClient":
+    """Get the process-wide async Tavily client with pooled connections."""
+    global _async_client
+    with _client_lock:
+        if _async_client is None:
+            from tavily import AsyncTavilyClient
+
+            client = AsyncTavilyClient(api_key=get_tavily_api_key())
+            create_client = getattr(client, "_client_creator", None)
+            if callable(create_client):
+                client._client_creator = _PooledAsyncClient(create_client)
+            _async_client = client
+    return _async_client
+
+
+_background_loop: asyncio.AbstractEventLoop | None = None
+_background_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """Get a long-lived event loop running on a daemon thread.
+
+    Sync callers of async tools submit coroutines here instead of spinning
+    up a new loop per call, which also works when the calling thread
+    already has a running loop.
+    """
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="shoe-search-loop", daemon=True
+            ).start()
+            _background_loop = loop
+    return _background_loop
+
+
+class _OnnxEmbedder:
+    """Sentence embeddings from a quantized MiniLM ONNX Runtime session."""
+
+    def __init__(self, model_dir: str) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, "model_int8.onnx"),
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(
+            os.path.join(model_dir, "tokenizer.json")
+        )
+        self.tokenizer.enable_truncation(max_length=EMBEDDING_MAX_TOKENS)
+        self.tokenizer.enable_padding()
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        """Embed texts in one forward pass as (N, dim) L2-normalized rows."""
+        encodings = self.tokenizer.encode_batch(texts)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": mask,
+        }
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.array(
+                [e.type_ids for e in encodings], dtype=np.int64
+            )
+
+        hidden = self.session.run(None, inputs)[0]
+
+        # Mean-pool over real tokens, then normalize so dot product is cosine
+        weights = mask[..., np.newaxis].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.astype(np.float32)
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed text as an L2-normalized float32 vector."""
+        return self.embed_batch([text])[0]
+
+
+_embedder: _OnnxEmbedder | None = None
+_embedder_loaded = False
+_embedder_lock = threading.Lock()
+
+
+def _get_embedder() -> _OnnxEmbedder | None:
+    """Load the embedding model once per process.
+
+    Returns None when the exported model is missing, which disables the
+    semantic cache rather than failing searches.
+    """
+    global _embedder, _embedder_loaded
+    with _embedder_lock:
+        if not _embedder_loaded:
+            _embedder_loaded = True
+            try:
+                model_dir = os.getenv("SHOE_EMBEDDING_MODEL_DIR", EMBEDDING_MODEL_DIR)
+                _embedder = _OnnxEmbedder(model_dir)
+            except Exception as e:
+                warnings.warn(f"Semantic cache disabled: {e}", stacklevel=2)
+    return _embedder
+
+
+class _SemanticShoeCache:
+    """Embedding-keyed cache of ShoeSpecs JSON for near-duplicate shoe names.
+
+    "Nike Pegasus 41" and "pegasus 41 nike" embed to nearly the same vector,
+    so a cosine-similarity lookup lets paraphrased queries skip Tavily.
+    """
+
+    def __init__(
+        self,
+        threshold: float = CACHE_SIMILARITY_THRESHOLD,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+    ) -> None:
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # Row i of every array below describes the same entry; rows [0, _n) are live
+        self._n = 0
+        self._mat = np.empty((0, 0), dtype=np.float32)
+        self._created = np.empty(0)
+        self._last_used = np.empty(0)
+        self._keys: list[str] = []
+        self._scopes: list[str] = []
+        self._values: list[str] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(shoe_name: str) -> str:
+        """Lowercase and strip punctuation so trivial variants embed alike."""
+        return " ".join(_PUNCTUATION_RE.sub(" ", shoe_name.lower()).split())
+
+    def _embed(self, text: str) -> np.ndarray | None:
+        """Embed normalized text, or return None if no embedder is available."""
+        embedder = _get_embedder()
+        if embedder is None:
+            return None
+        return embedder.embed(text)
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray | None:
+        """Embed several texts in one pass, or return None without an embedder."""
+        embedder = _get_embedder()
+        if embedder is None:
+            return None
+        return embedder.embed_batch([self._normalize(t) for t in texts])
+
+    def _grow(self, dim: int) -> None:
+        """Double row capacity, up to max_entries. Caller must hold the lock."""
+        capacity = min(max(2 * len(self._mat), 16), self.max_entries)
+        mat = np.empty((capacity, dim), dtype=np.float32)
+        created = np.empty(capacity)
+        last_used = np.empty(capacity)
+        if self._n:
+            mat[:self._n] = self._mat[:self._n]
+            created[:self._n] = self._created[:self._n]
+            last_used[:self._n] = self._last_used[:self._n]
+        self._mat, self._created, self._last_used = mat, created, last_used
+
+    def _remove(self, idx: int) -> None:
+        """Drop an entry, moving the last row into its slot. Caller holds the lock."""
+        last = self._n - 1
+        if idx != last:
+            self._mat[idx] = self._mat[last]
+            self._created[idx] = self._created[last]
+            self._last_used[idx] = self._last_used[last]
+            self._keys[idx] = self._keys[last]
+            self._scopes[idx] = self._scopes[last]
+            self._values[idx] = self._values[last]
+        self._keys.pop()
+        self._scopes.pop()
+        self._values.pop()
+        self._n = last
+
+    @staticmethod
+    def _numbers(key: str) -> set[str]:
+        """Numeric tokens in a key, e.g. model versions like the 41 in Pegasus 41."""
+        return set(_NUMBER_RE.findall(key))
+
+    def _lookup(
+        self,
+        scores: np.ndarray,
+        key: str,
+        scope: str,
+        now: float,
+        expired: set[int],
+    ) -> str | None:
+        """Pick the best matching entry from one column of similarity scores.
+
+        A match must share the query's scope and numeric tokens: MiniLM scores
+        "Pegasus 40" and "Pegasus 41" as near-identical, but their specs differ.
+        Expired matches are collected in ``expired`` rather than removed, so
+        row indices stay valid for the other columns, and the next best
+        candidate is tried instead. Caller must hold the lock.
+        """
+        numbers = self._numbers(key)
+        hits = np.flatnonzero(scores >= self.threshold)
+        for i in hits[np.argsort(-scores[hits])]:
+            if self._scopes[i] != scope:
+                continue
+            if self._numbers(self._keys[i]) != numbers:
+                continue
+            if now - self._created[i] > self.ttl_seconds:
+                expired.add(int(i))
+                continue
+            self._last_used[i] = now
+            return self._values[i]
+        return None
+
+    def get(
+        self, shoe_name: str, scope: str = ""
+    ) -> tuple[str | None, np.ndarray | None]:
+        """Return cached specs JSON for a similar shoe name, if any.
+
+        Only entries stored under the same ``scope`` can match. The query
+        embedding is returned too so a miss can be stored without
+        embedding the name again.
+        """
+        values, embeddings = self.get_many([shoe_name], scope=scope)
+        return values[0], None if embeddings is None else embeddings[0]
+
+    def get_many(
+        self, shoe_names: list[str], scope: str = ""
+    ) -> tuple[list[str | None], np.ndarray | None]:
+        """Look up several shoe names with one embedding pass and one matmul.
+
+        Returns the cached values (None for misses) and the (N, dim) query
+        embeddings, which ``put`` accepts to skip re-embedding.
+        """
+        results: list[str | None] = [None] * len(shoe_names)
+        if not shoe_names:
+            return results, None
+
+        queries = self.embed_batch(shoe_names)
+        if queries is None:
+            return results, None
+        now = time.monotonic()
+
+        with self._lock:
+            if self._n == 0:
+                return results, queries
+
+            # Rows are unit vectors, so one matmul yields every cosine similarity
+            scores = self._mat[:self._n] @ queries.T
+            expired: set[int] = set()
+            for j in range(len(shoe_names)):
+                key = self._normalize(shoe_names[j])
+                results[j] = self._lookup(scores[:, j], key, scope, now, expired)
+
+            # Highest index first so swap-removal never moves a pending row
+            for idx in sorted(expired, reverse=True):
+                self._remove(idx)
+
+        return results, queries
+
+    def put(
+        self,
+        shoe_name: str,
+        specs_json: str,
+        scope: str = "",
+        embedding: np.ndarray | None = None,
+    ) -> None:
+        """Store specs JSON for a shoe name, evicting the LRU entry when full.
+
+        Pass the ``embedding`` returned by ``get``/``get_many`` to avoid a
+        second forward pass for the same name.
+        """
+        key = self._normalize(shoe_name)
+        if embedding is None:
+            embedding = self._embed(key)
+        if embedding is None:
+            return
+        now = time.monotonic()
+
+        with self._lock:
+            if self._n >= self.max_entries:
+                self._remove(int(np.argmin(self._last_used[:self._n])))
+            if self._n == len(self._mat):
+                self._grow(embedding.shape[0])
+
+            idx = self._n
+            self._mat[idx] = embedding
+            self._created[idx] = now
+            self._last_used[idx] = now
+            self._keys.append(key)
+            self._scopes.append(scope)
+            self._values.append(specs_json)
+            self._n += 1
+
+
+_shoe_cache = _SemanticShoeCache()
+
+
+def _parse_response(shoe_name: str, response: dict) -> ShoeSpecsDict:
+    """Parse Tavily response into a ShoeSpecs-shaped dict."""
+    sources: list[ShoeSourceDict] = []
+    # Tavily returns results ranked by score, so the first 3 that pass are the best
+    for r in response.get("results", ()):
+        score = r.get("score", 0.0)
+        if score > 0.5:
+            sources.append({
+                "title": r.get("title", ""),
+                "url": r.get("url", ""),
+                "content": r.get("content", "")[:500],
+                "score": score,
+            })
+            if len(sources) == 3:
+                break
+
+    return _specs_dict(
+        shoe_name,
+        response.get("answer") or "No specifications found.",
+        sources,
+    )
+
+
+def _split_results_by_shoe(
+    results: list[dict], shoe_names: list[str]
+) -> dict[str, list[dict]]:
+    """Bucket results from a combined search by the shoe each one mentions."""
+    buckets: dict[str, list[dict]] = {name: [] for name in shoe_names}
+    needles = [(name, name.lower()) for name in shoe_names]
+    unmatched = []
+
+    for r in results:
+        haystack = (r.get("title", "") + r.get("content", "")[:200]).lower()
+        matched = False
+        for name, needle in needles:
+            if needle in haystack:
+                buckets[name].append(r)
+                matched = True
+        if not matched:
+            unmatched.append(r)
+
+    # Hand out unattributed results, best first, to shoes that got nothing
+    empty = [name for name in shoe_names if not buckets[name]]
+    if empty:
+        unmatched.sort(key=lambda r: r.get("score", 0.0), reverse=True)
+        for i, r in enumerate(unmatched):
+            buckets[empty[i % len(empty)]].append(r)
+
+    return buckets
 
 
 class ShoeSearchInput(BaseModel):
@@ -52,59 +510,47 @@ class ShoeSearchTool(BaseTool):
     args_schema: type[BaseModel] = ShoeSearchInput
     return_direct: bool = False
 
-    client: TavilyClient | None = None
+    # TavilyClient; typed loosely so tavily is only imported on first use
+    client: Any = None
     use_domain_filter: bool = True
     search_depth: str = "advanced"
 
     model_config = {"arbitrary_types_allowed": True}
 
+    _base_search_params: dict[str, Any] = PrivateAttr(default_factory=dict)
+
     def __init__(self, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         if self.client is None:
-            self.client = TavilyClient(api_key=get_tavily_api_key())
+            self.client = _get_sync_client()
+        self._base_search_params = _make_search_params(
+            self.search_depth, self.use_domain_filter
+        )
+
+    def _extract_input(self, args: dict) -> str:
+        """Pull the shoe name out of LLM tool call args."""
+        return args.get("shoe_name") or args.get("shoe_names") or ""
 
     def _build_query(self, shoe_name: str) -> str:
         """Build an optimized search query for shoe specs."""
         return f"{shoe_name} running shoe specs heel drop stack height weight"
 
-    def _parse_response(self, shoe_name: str, response: dict) -> ShoeSpecs:
-        """Parse Tavily response into structured ShoeSpecs."""
-        sources = [
-            ShoeSource(
-                title=r.get("title", ""),
-                url=r.get("url", ""),
-                content=r.get("content", "")[:500],
-                score=r.get("score", 0.0),
-            )
-            for r in response.get("results", [])
-            if r.get("score", 0) > 0.5
-        ]
-
-        return ShoeSpecs(
-            name=shoe_name,
-            summary=response.get("answer", "No specifications found."),
-            sources=sources[:3],
-        )
-
     def _run(self, shoe_name: str) -> str:
         """Synchronous shoe search."""
         try:
-            query = self._build_query(shoe_name)
+            cached, embedding = _shoe_cache.get(shoe_name)
+            if cached is not None:
+                return cached
 
-            search_params = {
-                "query": query,
-                "search_depth": self.search_depth,
-                "max_results": 5,
-                "include_answer": "advanced",
-            }
-
-            if self.use_domain_filter:
-                search_params["include_domains"] = SHOE_DOMAINS
+            query = self._build_query(shoe_name)
+            search_params = self._base_search_params | {"query": query}
 
             response = self.client.search(**search_params)
-            specs = self._parse_response(shoe_name, response)
+            specs = _parse_response(shoe_name, response)
+            if specs["sources"]:
+                _shoe_cache.put(shoe_name, _fast_json(specs), embedding=embedding)
 
-            return specs.model_dump_json(indent=2)
+            return _fast_json(specs)
 
         except Exception as e:
             raise ToolException(f"Failed to search for {shoe_name}: {e}") from e
@@ -122,61 +568,108 @@ class AsyncShoeSearchTool(BaseTool):
     )
     return_direct: bool = False
 
-    async_client: AsyncTavilyClient | None = None
+    # AsyncTavilyClient; typed loosely so tavily is only imported on first use
+    async_client: Any = None
     use_domain_filter: bool = True
     search_depth: str = "advanced"
     max_shoes: int = 5
+    batch_mode: bool = False
+    search_timeout: float = 8.0
 
     model_config = {"arbitrary_types_allowed": True}
 
+    _base_search_params: dict[str, Any] = PrivateAttr(default_factory=dict)
+
     def __init__(self, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         if self.async_client is None:
-            self.async_client = AsyncTavilyClient(api_key=get_tavily_api_key())
+            self.async_client = _get_async_client()
+        self._base_search_params = _make_search_params(
+            self.search_depth, self.use_domain_filter
+        )
 
-    def _build_query(self, shoe_name: str) -> str:
-        """Build an optimized search query for shoe specs."""
-        return f"{shoe_name} running shoe specs heel drop stack height weight"
+    def _extract_input(self, args: dict) -> str:
+        """Pull the comma-separated shoe names out of LLM tool call args."""
+        return args.get("shoe_names") or args.get("shoe_name") or ""
+
+    def _build_query(self, shoe_names: list[str]) -> str:
+        """Build an optimized search query for one or more shoes."""
+        if len(shoe_names) == 1:
+            return f"{shoe_names[0]} running shoe specs heel drop stack height weight"
+        return (
+            f"running shoe specs for: {'; '.join(shoe_names)} "
+            "heel drop stack height weight"
+        )
 
-    def _parse_response(self, shoe_name: str, response: dict) -> ShoeSpecs:
-        """Parse Tavily response into structured ShoeSpecs."""
-        sources = [
-            ShoeSource(
-                title=r.get("title", ""),
-                url=r.get("url", ""),
-                content=r.get("content", "")[:500],
-                score=r.get("score", 0.0),
-            )
-            for r in response.get("results", [])
-            if r.get("score", 0) > 0.5
-        ]
+    async def _search_single(
+        self, shoe_name: str, embedding: np.ndarray | None = None
+    ) -> ShoeSpecsDict:
+        """Search for a single shoe asynchronously and cache the result.
 
-        return ShoeSpecs(
-            name=shoe_name,
-            summary=response.get("answer", "No specifications found."),
-            sources=sources[:3],
-        )
+        The caller does the cache lookup; this only stores a successful
+        result, reusing ``embedding`` from that lookup.
+        """
+        query = self._build_query([shoe_name])
+        search_params = self._base_search_params | {"query": query}
 
-    async def _search_single(self, shoe_name: str) -> ShoeSpecs:
-        """Search for a single shoe asynchronously."""
-        query = self._build_query(shoe_name)
+        response = await self.async_client.search(**search_params)
+        specs = _parse_response(shoe_name, response)
+        if specs["sources"]:
+            await asyncio.to_thread(
+                _shoe_cache.put, shoe_name, _fast_json(specs), "", embedding
+            )
+        return specs
 
-        search_params = {
-            "query": query,
-            "search_depth": self.search_depth,
-            "max_results": 5,
-            "include_answer": "advanced",
-        }
+    async def _search_or_placeholder(
+        self, shoe_name: str, embedding: np.ndarray | None = None
+    ) -> ShoeSpecsDict:
+        """Search for one shoe, turning failures and timeouts into placeholders.
 
-        if self.use_domain_filter:
-            search_params["include_domains"] = SHOE_DOMAINS
+        Returning instead of raising keeps one bad search from cancelling its
+        siblings in the TaskGroup.
+        """
+        try:
+            return await asyncio.wait_for(
+                self._search_single(shoe_name, embedding),
+                timeout=self.search_timeout,
+            )
+        except TimeoutError:
+            return _specs_dict(shoe_name, "Search timed out.")
+        except Exception as e:
+            return _specs_dict(shoe_name, f"Search failed: {e}")
+
+    async def _search_batch(
+        self, shoe_names: list[str]
+    ) -> tuple[list[ShoeSpecsDict], str | None]:
+        """Search for several shoes with one combined Tavily request.
+
+        Tavily writes a single answer covering every shoe, so it is returned
+        once alongside the per-shoe sources rather than used as each shoe's
+        summary. Results aren't cached for the same reason.
+        """
+        search_params = self._base_search_params | {
+            "query": self._build_query(shoe_names),
+            "max_results": min(5 * len(shoe_names), TAVILY_MAX_RESULTS),
+        }
 
         response = await self.async_client.search(**search_params)
-        return self._parse_response(shoe_name, response)
+        buckets = _split_results_by_shoe(response.get("results", []), shoe_names)
+
+        shoes = [
+            _parse_response(
+                name,
+                {"answer": BATCH_SUMMARY, "results": buckets[name]},
+            )
+            for name in shoe_names
+        ]
+        return shoes, response.get("answer")
 
     def _run(self, shoe_names: str) -> str:
         """Synchronous wrapper for async search."""
-        return asyncio.run(self._arun(shoe_names))
+        future = asyncio.run_coroutine_threadsafe(
+            self._arun(shoe_names), _get_background_loop()
+        )
+        return future.result()
 
     async def _arun(self, shoe_names: str) -> str:
         """Async multi-shoe search."""
@@ -187,34 +680,60 @@ class AsyncShoeSearchTool(BaseTool):
             if not names:
                 raise ToolException("No valid shoe names provided")
 
-            results = await asyncio.gather(
-                *[self._search_single(name) for name in names],
-                return_exceptions=True,
-            )
-
-            shoes = []
-            for name, result in zip(names, results):
-                if isinstance(result, Exception):
-                    shoes.append(
-                        ShoeSpecs(name=name, summary=f"Search failed: {result}")
+            # One embedding pass and one matmul resolves every cached shoe;
+            # the same embeddings are reused when storing the misses
+            cached, embeddings = await asyncio.to_thread(_shoe_cache.get_many, names)
+            results: list = [orjson.loads(c) if c is not None else None for c in cached]
+            miss_idx = [i for i, r in enumerate(results) if r is None]
+            misses = [names[i] for i in miss_idx]
+            raw_answer = None
+
+            if self.batch_mode and len(misses) > 1:
+                try:
+                    fetched, raw_answer = await asyncio.wait_for(
+                        self._search_batch(misses), timeout=self.search_timeout
                     )
-                else:
-                    shoes.append(result)
-
-            search_result = ShoeSearchResult(
-                query=shoe_names,
-                shoes=shoes,
-            )
+                except TimeoutError:
+                    fetched = [_specs_dict(n, "Search timed out.") for n in misses]
+                except Exception as e:
+                    fetched = [_specs_dict(n, f"Search failed: {e}") for n in misses]
+            else:
+                # Cancelling _arun (e.g. the user aborts) cancels every search
+                async with asyncio.TaskGroup() as tg:
+                    tasks = [
+                        tg.create_task(self._search_or_placeholder(
+                            names[i],
+                            None if embeddings is None else embeddings[i],
+                        ))
+                        for i in miss_idx
+                    ]
+                fetched = [task.result() for task in tasks]
+
+            fetched_iter = iter(fetched)
+            shoes = [r if r is not None else next(fetched_iter) for r in results]
+
+            search_result: ShoeSearchResultDict = {
+                "query": shoe_names,
+                "shoes": shoes,
+                "raw_answer": raw_answer,
+            }
 
-            return search_result.model_dump_json(indent=2)
+            return _fast_json(search_result)
 
         except Exception as e:
             raise ToolException(f"Multi-shoe search failed: {e}") from e
 
 
-def get_shoe_tools() -> list[BaseTool]:
-    """Get all shoe discovery tools."""
+def get_shoe_tools(batch_mode: bool | None = None) -> list[BaseTool]:
+    """Get all shoe discovery tools.
+
+    ``batch_mode`` makes multi_shoe_search fetch every uncached shoe with one
+    combined Tavily request. It defaults to the SHOE_SEARCH_BATCH_MODE
+    environment variable ("1" to enable).
+    """
+    if batch_mode is None:
+        batch_mode = os.getenv("SHOE_SEARCH_BATCH_MODE") == "1"
     return [
         ShoeSearchTool(),
-        AsyncShoeSearchTool(),
+        AsyncShoeSearchTool(batch_mode=batch_mode),
     ]